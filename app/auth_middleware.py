@@ -1,5 +1,6 @@
 """Authentication middleware for protecting routes and managing sessions."""
 
+from contextvars import ContextVar
 from functools import wraps
 from typing import Optional, Callable
 
@@ -8,14 +9,25 @@ from nicegui import app, ui
 from app.auth_service import validate_session
 from app.models import User
 
+# Per-request memo of the resolved user, so a page wrapped in require_auth
+# doesn't run the session validation twice when it calls get_current_user
+_request_user: ContextVar[Optional[User]] = ContextVar("_request_user", default=None)
+
 
 def get_current_user() -> Optional[User]:
     """Get the current authenticated user from session storage."""
+    user = _request_user.get()
+    if user is not None:
+        return user
+
     session_token = app.storage.user.get("session_token")
     if not session_token:
         return None
 
-    return validate_session(session_token)
+    user = validate_session(session_token)
+    if user is not None:
+        _request_user.set(user)
+    return user
 
 
 def require_auth(func: Callable) -> Callable:
@@ -31,7 +43,12 @@ def require_auth(func: Callable) -> Callable:
                 app.storage.user["redirect_after_login"] = request_url.url.path
             ui.navigate.to("/login")
             return None
-        return func(*args, **kwargs)
+
+        token = _request_user.set(user)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _request_user.reset(token)
 
     return wrapper
 
@@ -43,6 +60,7 @@ def login_user(session_token: str) -> None:
 
 def logout_current_user() -> None:
     """Clear session from user storage."""
+    _request_user.set(None)
     if "session_token" in app.storage.user:
         del app.storage.user["session_token"]
     if "redirect_after_login" in app.storage.user:
@@ -1,29 +1,163 @@
 """Authentication service for user management and session handling."""
 
+import asyncio
 import hashlib
+import hmac
+import logging
+import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
 
-from sqlmodel import select
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import col, delete, select, update
 
 from app.database import get_session
 from app.models import User, UserSession, UserCreate, UserLogin
 
+# Hot-path statements built once at import: reusing the same statement
+# objects lets SQLAlchemy serve the compiled SQL from cache instead of
+# rebuilding the expression tree on every request.
+_VALIDATE_SESSION_STMT = (
+    select(UserSession, User)
+    .join(User, UserSession.user_id == User.id)  # type: ignore[arg-type]
+    .where(
+        UserSession.session_token_hash == bindparam("token_hash"),
+        UserSession.is_active,
+        UserSession.expires_at_ts > bindparam("now_ts"),
+        User.is_active,
+    )
+)
+
+_AUTH_CREDENTIALS_STMT = select(User.id, User.password_hash, User.is_active).where(  # type: ignore[call-overload]
+    User.username == bindparam("username")
+)
+
+_DEACTIVATE_SESSIONS_STMT = (
+    update(UserSession).where(UserSession.user_id == bindparam("uid"), UserSession.is_active).values(is_active=False)  # type: ignore[arg-type, call-arg]
+)
+
+# In-process cache for validated sessions. Entries map session_token to the
+# resolved user plus the session expiry and a short cache deadline, so the
+# common per-request validation becomes a dict lookup instead of SQL queries.
+SESSION_CACHE_TTL = float(os.environ.get("AUTH_SESSION_CACHE_TTL", "30"))
+_SESSION_CACHE_MAX_SIZE = 10_000
+
+_session_cache: "OrderedDict[str, Tuple[User, float, float]]" = OrderedDict()
+_session_cache_user_tokens: Dict[int, Set[str]] = {}
+_session_cache_lock = threading.Lock()
+
+
+def _session_cache_get(session_token: str) -> Optional[User]:
+    """Return the cached user for a token if the entry is still fresh."""
+    with _session_cache_lock:
+        entry = _session_cache.get(session_token)
+        if entry is None:
+            return None
+
+        user, expires_at_ts, cached_until = entry
+        now = time.time()
+        if now >= cached_until or now >= expires_at_ts:
+            _session_cache_drop_locked(session_token)
+            return None
+
+        _session_cache.move_to_end(session_token)
+        return user
+
+
+def _session_cache_put(session_token: str, user: User, expires_at_ts: float) -> None:
+    """Cache a validated session for SESSION_CACHE_TTL seconds."""
+    with _session_cache_lock:
+        _session_cache[session_token] = (user, expires_at_ts, time.time() + SESSION_CACHE_TTL)
+        _session_cache.move_to_end(session_token)
+        if user.id is not None:
+            _session_cache_user_tokens.setdefault(user.id, set()).add(session_token)
+        while len(_session_cache) > _SESSION_CACHE_MAX_SIZE:
+            oldest_token, (oldest_user, _, _) = _session_cache.popitem(last=False)
+            _session_cache_forget_user_token_locked(oldest_token, oldest_user.id)
+
+
+def _session_cache_drop_locked(session_token: str) -> None:
+    """Remove a single token from the cache (lock must be held)."""
+    entry = _session_cache.pop(session_token, None)
+    if entry is not None:
+        _session_cache_forget_user_token_locked(session_token, entry[0].id)
+
+
+def _session_cache_forget_user_token_locked(session_token: str, user_id: Optional[int]) -> None:
+    """Drop a token from the per-user reverse index (lock must be held)."""
+    if user_id is None:
+        return
+    tokens = _session_cache_user_tokens.get(user_id)
+    if tokens is not None:
+        tokens.discard(session_token)
+        if not tokens:
+            del _session_cache_user_tokens[user_id]
+
+
+def invalidate_session_cache(session_token: str) -> None:
+    """Remove a cached session entry, e.g. after logout."""
+    with _session_cache_lock:
+        _session_cache_drop_locked(session_token)
+
+
+def invalidate_user_session_cache(user_id: int) -> None:
+    """Remove all cached session entries for a user, e.g. after re-login."""
+    with _session_cache_lock:
+        for token in _session_cache_user_tokens.pop(user_id, set()):
+            _session_cache.pop(token, None)
+
+
+PBKDF2_ITERATIONS = 200_000
+
+# scrypt cost parameters: 2^14 blocks of 8 * 128 bytes = 16 MiB per hash,
+# which keeps large-scale GPU/ASIC cracking memory-bound
+SCRYPT_N = 2**14
+SCRYPT_R = 8
+SCRYPT_P = 1
+_SCRYPT_MAXMEM = 64 * 1024 * 1024
+
+
+# Server-side key for the token lookup digest: without it, read access to
+# the user_sessions table would be enough to forge lookup keys
+_TOKEN_HMAC_KEY = os.environ.get("AUTH_TOKEN_HMAC_KEY", "TOKEN_HMAC_KEY").encode()
+
+
+def _token_lookup_hash(session_token: str) -> bytes:
+    """Fixed-width (32-byte) keyed lookup digest for a session token."""
+    return hmac.new(_TOKEN_HMAC_KEY, session_token.encode(), "sha256").digest()
+
 
 def hash_password(password: str) -> str:
-    """Hash password using SHA-256 with salt."""
-    salt = secrets.token_hex(16)
-    password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-    return f"{salt}:{password_hash}"
+    """Hash password using the memory-hard scrypt KDF with a random salt."""
+    salt = secrets.token_bytes(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, maxmem=_SCRYPT_MAXMEM)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest.hex()}"
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    """Verify password against hash."""
+    """Verify password against a scrypt hash (or an older PBKDF2 / salted SHA-256 hash)."""
     try:
+        if password_hash.startswith("scrypt$"):
+            _, n, r, p, salt_hex, digest_hex = password_hash.split("$")
+            digest = hashlib.scrypt(
+                password.encode(), salt=bytes.fromhex(salt_hex), n=int(n), r=int(r), p=int(p), maxmem=_SCRYPT_MAXMEM
+            )
+            return hmac.compare_digest(digest.hex(), digest_hex)
+
+        if password_hash.startswith("pbkdf2_sha256$"):
+            _, iterations, salt_hex, digest_hex = password_hash.split("$")
+            digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt_hex), int(iterations))
+            return hmac.compare_digest(digest.hex(), digest_hex)
+
+        # Legacy format: "salt:sha256(password + salt)"
         salt, stored_hash = password_hash.split(":")
         password_hash_check = hashlib.sha256((password + salt).encode()).hexdigest()
-        return stored_hash == password_hash_check
+        return hmac.compare_digest(stored_hash, password_hash_check)
     except ValueError:
         # Log the error for debugging
         import logging
@@ -32,123 +166,233 @@ def verify_password(password: str, password_hash: str) -> bool:
         return False
 
 
-def create_user(user_data: UserCreate) -> Optional[User]:
-    """Create a new user with hashed password."""
-    with get_session() as session:
-        # Check if username or email already exists
-        existing_user = session.exec(
-            select(User).where((User.username == user_data.username) | (User.email == user_data.email))
-        ).first()
+def password_needs_rehash(password_hash: str) -> bool:
+    """Check whether a stored hash uses a superseded scheme (salted SHA-256 or PBKDF2)."""
+    return "$" not in password_hash or password_hash.startswith("pbkdf2_sha256$")
 
-        if existing_user:
-            return None
 
+def create_user(user_data: UserCreate, *, password_hash: Optional[str] = None) -> Optional[User]:
+    """Create a new user with hashed password.
+
+    password_hash lets callers supply a precomputed hash for a fixed,
+    well-known password (e.g. the demo account) and skip the KDF run;
+    verification still goes through verify_password unchanged.
+    """
+    if password_hash is None:
         password_hash = hash_password(user_data.password)
-        user = User(
+    user = User(
+        username=user_data.username,
+        email=user_data.email,
+        password_hash=password_hash,
+        full_name=user_data.full_name,
+    )
+
+    # No duplicate pre-check: the unique constraints on username/email are
+    # authoritative, so the common (success) case is a single INSERT
+    with get_session() as session:
+        session.add(user)
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return None
+        return user
+
+
+def create_users_bulk(users_data: List[UserCreate]) -> Optional[List[User]]:
+    """Create several users in one INSERT batch with a single commit.
+
+    Mainly useful for seeding (tests, fixtures): collapsing N commits into
+    one saves a round-trip and an fsync per user. All-or-nothing — if any
+    row violates a unique constraint the whole batch is rolled back.
+    """
+    users = [
+        User(
             username=user_data.username,
             email=user_data.email,
-            password_hash=password_hash,
+            password_hash=hash_password(user_data.password),
             full_name=user_data.full_name,
         )
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-        return user
+        for user_data in users_data
+    ]
+
+    with get_session() as session:
+        session.add_all(users)
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return None
+        return users
 
 
 def authenticate_user(login_data: UserLogin) -> Optional[User]:
     """Authenticate user with username and password."""
     with get_session() as session:
-        user = session.exec(select(User).where(User.username == login_data.username)).first()
+        # Fetch only the columns needed for verification; the full row is
+        # loaded once the password checks out (failed logins stay cheap)
+        row = session.exec(_AUTH_CREDENTIALS_STMT, params={"username": login_data.username}).first()
 
-        if user is None or not user.is_active:
+        if row is None:
             return None
 
-        if not verify_password(login_data.password, user.password_hash):
+        user_id, password_hash, is_active = row
+        if user_id is None or not is_active or not verify_password(login_data.password, password_hash):
             return None
 
-        # Update last login
-        user.last_login = datetime.utcnow()
-        user.is_authenticated = True
-        session.add(user)
+        user = session.get(User, user_id)
+        if user is None:
+            return None
+
+    # Transparently upgrade legacy hashes now that we know the password
+    new_password_hash = hash_password(login_data.password) if password_needs_rehash(password_hash) else None
+
+    # Reflect the login on the returned instance immediately; the actual
+    # UPDATE is written off the login path so the response doesn't wait on
+    # a users-row lock and WAL flush. Authenticated-ness is session state
+    # and is never persisted.
+    now = datetime.utcnow()
+    user.last_login = now
+    if new_password_hash is not None:
+        user.password_hash = new_password_hash
+    user.is_authenticated = True
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _persist_login_update(user_id, now, new_password_hash)
+    else:
+        future = loop.run_in_executor(None, _persist_login_update, user_id, now, new_password_hash)
+        future.add_done_callback(_log_login_persist_failure)
+
+    return user
+
+
+def _log_login_persist_failure(future: "asyncio.Future[None]") -> None:
+    """Surface exceptions from the off-path login write instead of dropping them."""
+    exc = future.exception()
+    if exc is not None:
+        logging.getLogger(__name__).error("Post-login persistence failed", exc_info=exc)
+
+
+def _persist_login_update(user_id: int, last_login: datetime, password_hash: Optional[str] = None) -> None:
+    """Write post-login bookkeeping (last_login, upgraded hash) to the database."""
+    with get_session() as session:
+        user = session.get(User, user_id)
+        if user is None:
+            return
+        user.last_login = last_login
+        if password_hash is not None:
+            user.password_hash = password_hash
         session.commit()
-        session.refresh(user)
-        return user
 
 
 def create_session(user_id: int) -> Optional[UserSession]:
     """Create a new session for the user."""
-    with get_session() as session:
-        # Deactivate existing sessions for the user
-        existing_sessions = session.exec(
-            select(UserSession).where(UserSession.user_id == user_id, UserSession.is_active)
-        ).all()
+    invalidate_user_session_cache(user_id)
 
-        for existing_session in existing_sessions:
-            existing_session.is_active = False
-            session.add(existing_session)
+    with get_session() as session:
+        # Deactivate existing sessions for the user in a single UPDATE
+        session.exec(_DEACTIVATE_SESSIONS_STMT, params={"uid": user_id})  # type: ignore[call-overload]
 
         # Create new session
         session_token = secrets.token_urlsafe(32)
         expires_at = datetime.utcnow() + timedelta(hours=24)
-
-        user_session = UserSession(user_id=user_id, session_token=session_token, expires_at=expires_at)
+        expires_at_ts = int(time.time()) + 24 * 3600
+
+        user_session = UserSession(
+            user_id=user_id,
+            session_token=session_token,
+            session_token_hash=_token_lookup_hash(session_token),
+            expires_at=expires_at,
+            expires_at_ts=expires_at_ts,
+        )
         session.add(user_session)
         session.commit()
-        session.refresh(user_session)
         return user_session
 
 
 def validate_session(session_token: Optional[str]) -> Optional[User]:
     """Validate session token and return user if valid."""
-    if not session_token:
+    # Real tokens are 43 chars (token_urlsafe(32)); anything shorter is
+    # malformed and not worth a cache probe or a DB round-trip
+    if not session_token or len(session_token) < 20:
         return None
 
+    cached_user = _session_cache_get(session_token)
+    if cached_user is not None:
+        return cached_user
+
+    token_hash = _token_lookup_hash(session_token)
     with get_session() as session:
-        user_session = session.exec(
-            select(UserSession).where(
-                UserSession.session_token == session_token,
-                UserSession.is_active,
-                UserSession.expires_at > datetime.utcnow(),
-            )
+        result = session.exec(
+            _VALIDATE_SESSION_STMT,
+            params={"token_hash": token_hash, "now_ts": int(time.time())},
         ).first()
 
-        if user_session is None:
+        if result is None:
             return None
 
-        user = session.get(User, user_session.user_id)
-        if user is None or not user.is_active:
+        user_session, user = result
+        # Re-check the digest with a constant-time compare rather than
+        # trusting the SQL equality alone
+        if not hmac.compare_digest(user_session.session_token_hash, token_hash):
             return None
-
+        # A valid active session implies the user is authenticated
+        user.is_authenticated = True
+        _session_cache_put(session_token, user, user_session.expires_at_ts)
         return user
 
 
 def logout_user(session_token: Optional[str]) -> bool:
     """Logout user by deactivating session."""
-    if not session_token:
+    # Same malformed-token early out as validate_session
+    if not session_token or len(session_token) < 20:
         return False
 
+    invalidate_session_cache(session_token)
+
     with get_session() as session:
         user_session = session.exec(
-            select(UserSession).where(UserSession.session_token == session_token, UserSession.is_active)
+            select(UserSession).where(
+                UserSession.session_token_hash == _token_lookup_hash(session_token), UserSession.is_active
+            )
         ).first()
 
         if user_session is None:
             return False
 
         user_session.is_active = False
-        session.add(user_session)
-
-        # Update user authentication status
-        user = session.get(User, user_session.user_id)
-        if user:
-            user.is_authenticated = False
-            session.add(user)
-
         session.commit()
         return True
 
 
+SESSION_SWEEP_BATCH_SIZE = 1000
+
+
+def sweep_expired_sessions() -> int:
+    """Delete expired or deactivated session rows in bounded batches.
+
+    Keeps the user_sessions table (and its indexes) small so the hot
+    validate_session lookups don't scan ever-growing structures. Returns
+    the number of rows removed.
+    """
+    removed = 0
+    while True:
+        with get_session() as session:
+            stale_ids = (
+                select(UserSession.id)  # type: ignore[call-overload]
+                .where((col(UserSession.expires_at_ts) < int(time.time())) | (col(UserSession.is_active).is_(False)))
+                .limit(SESSION_SWEEP_BATCH_SIZE)
+            )
+            result = session.exec(delete(UserSession).where(col(UserSession.id).in_(stale_ids)))  # type: ignore[arg-type, call-arg]
+            session.commit()
+
+        removed += result.rowcount
+        if result.rowcount < SESSION_SWEEP_BATCH_SIZE:
+            return removed
+
+
 def get_user_by_id(user_id: int) -> Optional[User]:
     """Get user by ID."""
     with get_session() as session:
@@ -1,5 +1,8 @@
 """Dashboard interface module."""
 
+from datetime import datetime
+from functools import lru_cache
+
 from nicegui import ui
 
 from app.auth_middleware import require_auth, get_current_user, logout_current_user
@@ -7,6 +10,31 @@ from app.auth_service import logout_user
 from app.dashboard_service import get_dashboard_data, get_user_statistics
 from nicegui import app
 
+# Static render data, built once at import instead of per page load
+_COLOR_PALETTE = {
+    "primary": "#2563eb",
+    "secondary": "#64748b",
+    "accent": "#10b981",
+    "positive": "#10b981",
+    "negative": "#ef4444",
+    "warning": "#f59e0b",
+    "info": "#3b82f6",
+}
+
+_ACTIVITIES = (
+    {"time": "2 minutes ago", "action": "Logged in successfully", "icon": "login"},
+    {"time": "1 hour ago", "action": "Profile updated", "icon": "edit"},
+    {"time": "1 day ago", "action": "Password changed", "icon": "security"},
+    {"time": "3 days ago", "action": "Email verified", "icon": "verified"},
+)
+
+_ACTIONS = (
+    {"label": "Update Profile", "icon": "person", "color": "primary"},
+    {"label": "Change Password", "icon": "lock", "color": "secondary"},
+    {"label": "View Settings", "icon": "settings", "color": "info"},
+    {"label": "Help & Support", "icon": "help", "color": "warning"},
+)
+
 
 def create():
     """Create the dashboard page."""
@@ -18,20 +46,13 @@ def create():
         if user is None:
             return
 
-        # Get dashboard data
-        dashboard_data = get_dashboard_data(user)
-        user_stats = get_user_statistics(user)
+        # Get dashboard data, evaluating "now" once for the whole render
+        now = datetime.utcnow()
+        dashboard_data = get_dashboard_data(user, now)
+        user_stats = get_user_statistics(user, now)
 
         # Apply modern theme colors
-        ui.colors(
-            primary="#2563eb",
-            secondary="#64748b",
-            accent="#10b981",
-            positive="#10b981",
-            negative="#ef4444",
-            warning="#f59e0b",
-            info="#3b82f6",
-        )
+        ui.colors(**_COLOR_PALETTE)
 
         with ui.column().classes("w-full min-h-screen bg-gray-50"):
             # Header with navigation
@@ -124,14 +145,7 @@ def create_activity_section(dashboard_data):
 
     with ui.card().classes("w-full p-6 rounded-xl shadow-lg"):
         # Sample activity data
-        activities = [
-            {"time": "2 minutes ago", "action": "Logged in successfully", "icon": "login"},
-            {"time": "1 hour ago", "action": "Profile updated", "icon": "edit"},
-            {"time": "1 day ago", "action": "Password changed", "icon": "security"},
-            {"time": "3 days ago", "action": "Email verified", "icon": "verified"},
-        ]
-
-        for activity in activities:
+        for activity in _ACTIVITIES:
             with ui.row().classes("items-center gap-4 py-3 border-b border-gray-100 last:border-b-0"):
                 ui.icon(activity["icon"]).classes("text-gray-500")
                 with ui.column().classes("flex-1"):
@@ -145,14 +159,7 @@ def create_sidebar(user, dashboard_data):
         ui.label("Quick Actions").classes("text-lg font-semibold text-gray-800 mb-4")
 
         # Quick action buttons
-        actions = [
-            {"label": "Update Profile", "icon": "person", "color": "primary"},
-            {"label": "Change Password", "icon": "lock", "color": "secondary"},
-            {"label": "View Settings", "icon": "settings", "color": "info"},
-            {"label": "Help & Support", "icon": "help", "color": "warning"},
-        ]
-
-        for action in actions:
+        for action in _ACTIONS:
             ui.button(
                 action["label"],
                 icon=action["icon"],
@@ -164,16 +171,20 @@ def create_sidebar(user, dashboard_data):
         # User info section
         ui.label("Account Details").classes("text-lg font-semibold text-gray-800 mb-4")
 
-        info_items = [
-            {"label": "Username", "value": user.username},
-            {"label": "Email", "value": user.email},
-            {"label": "Member since", "value": user.created_at.strftime("%B %Y")},
-        ]
-
-        for item in info_items:
+        for label, value in _account_detail_items(user.username, user.email, user.created_at):
             with ui.row().classes("justify-between items-center py-2"):
-                ui.label(item["label"]).classes("text-gray-600")
-                ui.label(item["value"]).classes("text-gray-800 font-medium")
+                ui.label(label).classes("text-gray-600")
+                ui.label(value).classes("text-gray-800 font-medium")
+
+
+@lru_cache(maxsize=1024)
+def _account_detail_items(username: str, email: str, created_at: datetime) -> tuple:
+    """Sidebar account rows, cached across renders since they only change with the profile."""
+    return (
+        ("Username", username),
+        ("Email", email),
+        ("Member since", created_at.strftime("%B %Y")),
+    )
 
 
 async def handle_logout():
@@ -5,41 +5,39 @@ from typing import Optional
 
 from app.models import User, UserResponse, DashboardData
 
+# Greeting per UTC hour: 0-4 evening, 5-11 morning, 12-16 afternoon, 17-23 evening.
+_GREETINGS = ("Good evening",) * 5 + ("Good morning",) * 7 + ("Good afternoon",) * 5 + ("Good evening",) * 7
 
-def get_session_duration(last_login: Optional[datetime]) -> str:
+
+def get_session_duration(last_login: Optional[datetime], now: Optional[datetime] = None) -> str:
     """Calculate session duration from last login."""
     if last_login is None:
         return "Unknown"
 
-    duration = datetime.utcnow() - last_login
+    total = ((now or datetime.utcnow()) - last_login).total_seconds()
 
-    if duration.total_seconds() < 60:
-        return f"{int(duration.total_seconds())} seconds"
-    elif duration.total_seconds() < 3600:
-        return f"{int(duration.total_seconds() / 60)} minutes"
+    if total < 60:
+        return f"{int(total)} seconds"
+    elif total < 3600:
+        return f"{int(total / 60)} minutes"
     else:
-        hours = int(duration.total_seconds() / 3600)
-        minutes = int((duration.total_seconds() % 3600) / 60)
+        hours = int(total / 3600)
+        minutes = int((total % 3600) / 60)
         return f"{hours}h {minutes}m"
 
 
-def generate_welcome_message(user: User) -> str:
+def generate_welcome_message(user: User, now: Optional[datetime] = None) -> str:
     """Generate personalized welcome message."""
-    current_hour = datetime.utcnow().hour
-
-    if 5 <= current_hour < 12:
-        greeting = "Good morning"
-    elif 12 <= current_hour < 17:
-        greeting = "Good afternoon"
-    else:
-        greeting = "Good evening"
-
+    greeting = _GREETINGS[(now or datetime.utcnow()).hour]
     return f"{greeting}, {user.full_name}! Welcome to your dashboard."
 
 
-def get_dashboard_data(user: User) -> DashboardData:
+def get_dashboard_data(user: User, now: Optional[datetime] = None) -> DashboardData:
     """Generate comprehensive dashboard data for the user."""
-    user_response = UserResponse(
+    now = now or datetime.utcnow()
+    # model_construct skips field validation — fine here since the values
+    # come straight from our own already-validated User instance
+    user_response = UserResponse.model_construct(
         id=user.id if user.id else 0,
         username=user.username,
         email=user.email,
@@ -50,20 +48,23 @@ def get_dashboard_data(user: User) -> DashboardData:
         created_at=user.created_at,
     )
 
-    return DashboardData(
+    return DashboardData.model_construct(
         user_info=user_response,
-        login_time=user.last_login if user.last_login else datetime.utcnow(),
-        session_duration=get_session_duration(user.last_login),
-        welcome_message=generate_welcome_message(user),
+        login_time=user.last_login if user.last_login else now,
+        session_duration=get_session_duration(user.last_login, now),
+        welcome_message=generate_welcome_message(user, now),
     )
 
 
-def get_user_statistics(user: User) -> dict:
+def get_user_statistics(user: User, now: Optional[datetime] = None) -> dict:
     """Get user-specific statistics for dashboard."""
+    now = now or datetime.utcnow()
     stats = {
-        "account_age_days": (datetime.utcnow() - user.created_at).days,
+        "account_age_days": (now - user.created_at).days,
         "total_logins": "N/A",  # Would need login history tracking
-        "last_activity": user.last_login.strftime("%Y-%m-%d %H:%M:%S") if user.last_login else "Never",
+        # isoformat with sep/timespec renders the same "%Y-%m-%d %H:%M:%S"
+        # string entirely in C, without strftime's locale machinery
+        "last_activity": user.last_login.isoformat(sep=" ", timespec="seconds") if user.last_login else "Never",
         "account_status": "Active" if user.is_active else "Inactive",
     }
 
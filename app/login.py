@@ -1,5 +1,7 @@
 """Login interface module."""
 
+from functools import lru_cache
+
 from nicegui import ui
 
 from app.auth_service import authenticate_user, create_session
@@ -51,7 +53,7 @@ def create():
                     login_button = ui.button(
                         "Sign In",
                         on_click=lambda: handle_login(
-                            username_input.value, password_input.value, error_label, login_button
+                            username_input.value or "", password_input.value or "", error_label, login_button
                         ),
                     ).classes(
                         "w-full bg-blue-600 hover:bg-blue-700 text-white py-3 rounded-lg font-semibold transition-colors"
@@ -71,7 +73,9 @@ def create():
                     # Handle Enter key
                     password_input.on(
                         "keydown.enter",
-                        lambda: handle_login(username_input.value, password_input.value, error_label, login_button),
+                        lambda: handle_login(
+                            username_input.value or "", password_input.value or "", error_label, login_button
+                        ),
                     )
 
 
@@ -125,6 +129,14 @@ def show_error(error_label, message: str):
     error_label.visible = True
 
 
+@lru_cache(maxsize=1)
+def _demo_password_hash() -> str:
+    """Hash the demo password once per process; "demo123" is a published constant."""
+    from app.auth_service import hash_password
+
+    return hash_password("demo123")
+
+
 def create_demo_account(error_label):
     """Create a demo account for testing."""
     from app.auth_service import create_user
@@ -133,7 +145,7 @@ def create_demo_account(error_label):
     try:
         demo_user = UserCreate(username="demo", email="demo@example.com", password="demo123", full_name="Demo User")
 
-        user = create_user(demo_user)
+        user = create_user(demo_user, password_hash=_demo_password_hash())
         if user:
             ui.notify("Demo account created successfully! You can now log in.", type="positive")
         else:
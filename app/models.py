@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from datetime import datetime
 from typing import Optional
@@ -13,7 +14,7 @@ class User(SQLModel, table=True):
     password_hash: str = Field(max_length=255)  # Store hashed passwords only
     full_name: str = Field(max_length=100)
     is_active: bool = Field(default=True)
-    is_authenticated: bool = Field(default=False)  # Track login state
+    is_authenticated: bool = Field(default=False)  # Derived from an active session; never written by auth flows
     last_login: Optional[datetime] = Field(default=None)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -21,11 +22,24 @@ class User(SQLModel, table=True):
 
 class UserSession(SQLModel, table=True):
     __tablename__ = "user_sessions"  # type: ignore[assignment]
+    # Covering index for the hot validate_session predicate, so the lookup is
+    # satisfied from the index without fetching the row first.
+    __table_args__ = (
+        Index("ix_user_sessions_token_active_expires", "session_token_hash", "is_active", "expires_at_ts"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
-    session_token: str = Field(max_length=255, unique=True, index=True)
+    # Not indexed: lookups go through session_token_hash, whose unique index
+    # also guarantees token uniqueness
+    session_token: str = Field(max_length=255)
+    # Keyed HMAC-SHA256 digest of the token: a fixed 32-byte lookup key,
+    # cheaper to index and compare than the variable-length token string
+    session_token_hash: bytes = Field(max_length=32, unique=True, index=True)
     expires_at: datetime
+    # UNIX-timestamp mirror of expires_at: hot-path expiry checks compare
+    # plain integers instead of constructing datetime objects
+    expires_at_ts: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = Field(default=True)
 
@@ -1,13 +1,40 @@
+import asyncio
+import logging
+import os
+
 from app.database import create_tables
+from app.auth_service import sweep_expired_sessions
 from nicegui import ui
 import app.login
 import app.dashboard
 
+SESSION_SWEEP_INTERVAL = float(os.environ.get("AUTH_SESSION_SWEEP_INTERVAL", "300"))
+
+
+async def _session_sweeper() -> None:
+    """Periodically purge expired and deactivated session rows."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            await loop.run_in_executor(None, sweep_expired_sessions)
+        except Exception:
+            logging.getLogger(__name__).exception("Session sweep failed")
+
 
 def startup() -> None:
     # this function is called before the first request
     create_tables()
 
+    # Keep the session table small; without a running loop (e.g. in tests)
+    # the sweeper is simply not scheduled
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        asyncio.create_task(_session_sweeper())
+
     # Initialize application modules
     app.login.create()
     app.dashboard.create()
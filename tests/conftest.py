@@ -1,12 +1,138 @@
-from typing import Generator
-import pytest
-from app.startup import startup
-from nicegui.testing import User
+import os
+
+# Select the in-memory test database before any app module builds the engine
+os.environ.setdefault("APP_TEST", "1")
+
+import asyncio  # noqa: E402
+import hashlib  # noqa: E402
+import hmac  # noqa: E402
+from typing import Generator, Optional  # noqa: E402
+import pytest  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+import app.auth_service  # noqa: E402
+import app.database  # noqa: E402
+from app.models import UserCreate  # noqa: E402
+from nicegui.testing import User  # noqa: E402
 
 pytest_plugins = ["nicegui.testing.plugin"]
 
 
+@pytest.fixture(scope="session")
+def _schema() -> Generator[None, None, None]:
+    """Create the schema once per test session instead of per test."""
+    app.database.create_tables()
+    yield
+
+
+# Memoized across tests: the suite hashes the same handful of passwords
+# ("password123", "demo123", ...) over and over
+_KDF_CACHE: dict[str, str] = {}
+
+_real_verify_password = app.auth_service.verify_password
+
+
+def _fast_hash_password(password: str) -> str:
+    return _KDF_CACHE.setdefault(password, "test$" + hashlib.sha256(password.encode()).hexdigest())
+
+
+def _fast_verify_password(password: str, password_hash: str) -> bool:
+    if password_hash.startswith("test$"):
+        return hmac.compare_digest(_fast_hash_password(password), password_hash)
+    return _real_verify_password(password, password_hash)
+
+
+@pytest.fixture(autouse=True)
+def _fast_kdf(monkeypatch) -> None:
+    """Swap the scrypt KDF for a cached SHA-256 fake on service code paths.
+
+    create_user/authenticate_user call the module globals, so every test that
+    merely needs a user skips the deliberately slow KDF. The KDF itself is
+    still covered: the hashing tests import the real functions directly, and
+    the fake verifier falls back to the real one for non-"test$" hashes.
+    """
+    monkeypatch.setattr(app.auth_service, "hash_password", _fast_hash_password)
+    monkeypatch.setattr(app.auth_service, "verify_password", _fast_verify_password)
+
+
+@pytest.fixture()
+def new_db(_schema, monkeypatch) -> Generator[None, None, None]:
+    """Run the test inside an outer transaction that is rolled back on teardown.
+
+    Sessions handed out during the test join the transaction via savepoints,
+    so service-level commits behave normally but nothing survives the test —
+    a single ROLLBACK replaces the DROP/CREATE cycle reset_db() used to run
+    twice per test.
+    """
+    connection = app.database.ENGINE.connect()
+    transaction = connection.begin()
+
+    def get_session() -> Session:
+        return Session(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+
+    monkeypatch.setattr(app.database, "get_session", get_session)
+    monkeypatch.setattr(app.auth_service, "get_session", get_session)
+    yield
+    transaction.rollback()
+    connection.close()
+
+
+def make_user(
+    username: str,
+    email: Optional[str] = None,
+    password: str = "password123",
+    full_name: Optional[str] = None,
+) -> UserCreate:
+    """Build a UserCreate for tests, deriving email/full_name from the username.
+
+    model_construct skips Pydantic field validation, which is safe for the
+    literal inputs tests use and avoids re-validating the same constants in
+    every test.
+    """
+    return UserCreate.model_construct(
+        username=username,
+        email=email or f"{username}@example.com",
+        password=password,
+        full_name=full_name or username.title(),
+    )
+
+
+# should_see/should_not_see poll in hardcoded 100/50 ms steps; elements
+# usually render within a few ms of the awaited interaction, so most of that
+# sleep is idle time. Poll every 20 ms with the same overall retry budget.
+# The wrappers mirror the implementation in the pinned nicegui 3.x line; if
+# the helpers they rely on ever disappear, the fixture falls back to the
+# stock (slower) methods instead of breaking every UI assertion.
+_UI_POLL_INTERVAL = 0.02
+_UI_POLL_RETRIES = 15
+
+
+async def _fast_should_see(self, target=None, *, kind=None, marker=None, content=None, retries=_UI_POLL_RETRIES):
+    for _ in range(retries):
+        if self._sees(target, kind, marker, content):
+            return
+        await asyncio.sleep(_UI_POLL_INTERVAL)
+    raise AssertionError("expected to see at least one " + self._build_error_message(target, kind, marker, content))
+
+
+async def _fast_should_not_see(self, target=None, *, kind=None, marker=None, content=None, retries=_UI_POLL_RETRIES):
+    for _ in range(retries):
+        if not self._sees(target, kind, marker, content):
+            return
+        await asyncio.sleep(_UI_POLL_INTERVAL)
+    raise AssertionError("expected not to see any " + self._build_error_message(target, kind, marker, content))
+
+
+@pytest.fixture(autouse=True)
+def _fast_ui_polling(monkeypatch) -> None:
+    if hasattr(User, "_sees") and hasattr(User, "_build_error_message"):
+        monkeypatch.setattr(User, "should_see", _fast_should_see)
+        monkeypatch.setattr(User, "should_not_see", _fast_should_not_see)
+
+
 @pytest.fixture
 def user(user: User) -> Generator[User, None, None]:
-    startup()
+    # NiceGUI's simulated user runs main.py per test (it resets all NiceGUI
+    # globals, so the app cannot be shared at module scope); main.py already
+    # registers startup() as an on_startup handler, so don't boot twice.
     yield user
@@ -1,26 +1,13 @@
 """Tests for authentication middleware logic (non-UI parts)."""
 
-import pytest
-
-from app.auth_service import create_user, create_session
-from app.models import UserCreate
-
-
-@pytest.fixture()
-def new_db():
-    from app.database import reset_db
-
-    reset_db()
-    yield
-    reset_db()
+from app.auth_service import create_user, create_session, validate_session
+from conftest import make_user
 
 
 def test_middleware_integration_with_real_auth(new_db):
     """Test middleware integration with real authentication service."""
     # Create user
-    user_data = UserCreate(
-        username="middlewareuser", email="middleware@example.com", password="password123", full_name="Middleware User"
-    )
+    user_data = make_user("middlewareuser", email="middleware@example.com", full_name="Middleware User")
     user = create_user(user_data)
     assert user is not None
     assert user.id is not None
@@ -30,8 +17,6 @@ def test_middleware_integration_with_real_auth(new_db):
     assert session is not None
 
     # Test session validation
-    from app.auth_service import validate_session
-
     validated_user = validate_session(session.session_token)
     assert validated_user is not None
     assert validated_user.id == user.id
@@ -40,8 +25,6 @@ def test_middleware_integration_with_real_auth(new_db):
 def test_auth_flow_edge_cases(new_db):
     """Test authentication edge cases."""
     # Test with None session token
-    from app.auth_service import validate_session
-
     result = validate_session(None)
     assert result is None
 
@@ -56,9 +39,7 @@ def test_auth_flow_edge_cases(new_db):
 
 def test_multiple_sessions_per_user(new_db):
     """Test creating multiple sessions for the same user."""
-    user_data = UserCreate(
-        username="multisession", email="multi@example.com", password="password123", full_name="Multi Session User"
-    )
+    user_data = make_user("multisession", email="multi@example.com", full_name="Multi Session User")
     user = create_user(user_data)
     assert user is not None
     assert user.id is not None
@@ -75,7 +56,6 @@ def test_multiple_sessions_per_user(new_db):
     assert session1.session_token != session2.session_token
 
     # Second session should be valid
-    from app.auth_service import validate_session
 
     validated_user = validate_session(session2.session_token)
     assert validated_user is not None
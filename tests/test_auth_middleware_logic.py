@@ -1,27 +1,15 @@
 """Tests for authentication middleware logic without UI context."""
 
-import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from app.auth_service import create_user, create_session, validate_session
-from app.models import UserCreate
-
-
-@pytest.fixture()
-def new_db():
-    from app.database import reset_db
-
-    reset_db()
-    yield
-    reset_db()
+from app.auth_service import create_user, create_session, validate_session, logout_user
+from conftest import make_user
 
 
 def test_validate_session_integration(new_db):
     """Test session validation with real database."""
     # Create user
-    user_data = UserCreate(
-        username="sessiontest", email="session@example.com", password="password123", full_name="Session Test User"
-    )
+    user_data = make_user("sessiontest", email="session@example.com", full_name="Session Test User")
     user = create_user(user_data)
     assert user is not None
     assert user.id is not None
@@ -55,9 +43,7 @@ def test_validate_session_empty_token(new_db):
 def test_user_authentication_flow(new_db):
     """Test complete user authentication flow."""
     # Create user
-    user_data = UserCreate(
-        username="flowtest", email="flow@example.com", password="password123", full_name="Flow Test User"
-    )
+    user_data = make_user("flowtest", email="flow@example.com", full_name="Flow Test User")
     user = create_user(user_data)
     assert user is not None
     assert user.id is not None
@@ -74,8 +60,6 @@ def test_user_authentication_flow(new_db):
     assert validated_user.username == "flowtest"
 
     # Logout user
-    from app.auth_service import logout_user
-
     result = logout_user(session.session_token)
     assert result
 
@@ -86,9 +70,7 @@ def test_user_authentication_flow(new_db):
 
 def test_session_expiration_logic(new_db):
     """Test session creation with proper expiration."""
-    user_data = UserCreate(
-        username="expirytest", email="expiry@example.com", password="password123", full_name="Expiry Test User"
-    )
+    user_data = make_user("expirytest", email="expiry@example.com", full_name="Expiry Test User")
     user = create_user(user_data)
     assert user is not None
     assert user.id is not None
@@ -97,8 +79,6 @@ def test_session_expiration_logic(new_db):
     assert session is not None
 
     # Session should expire in the future
-    from datetime import timedelta
-
     expected_min_expiry = datetime.utcnow() + timedelta(hours=23)
     expected_max_expiry = datetime.utcnow() + timedelta(hours=25)
 
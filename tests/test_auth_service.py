@@ -1,28 +1,24 @@
 """Tests for authentication service."""
 
-import pytest
+import hashlib
+
 from datetime import datetime
 
 from app.auth_service import (
     hash_password,
     verify_password,
     create_user,
+    create_users_bulk,
     authenticate_user,
     create_session,
     validate_session,
     logout_user,
     get_user_by_username,
+    sweep_expired_sessions,
 )
-from app.models import UserCreate, UserLogin
-
-
-@pytest.fixture()
-def new_db():
-    from app.database import reset_db
-
-    reset_db()
-    yield
-    reset_db()
+import app.database
+from app.models import User, UserLogin
+from conftest import make_user
 
 
 def test_hash_password():
@@ -30,11 +26,12 @@ def test_hash_password():
     password = "test_password123"
     hashed = hash_password(password)
 
-    # Should contain salt and hash separated by colon
-    assert ":" in hashed
-    salt, hash_part = hashed.split(":")
+    # Should be an scrypt hash with scheme, cost parameters, salt and digest
+    assert hashed.startswith("scrypt$")
+    scheme, n, r, p, salt, hash_part = hashed.split("$")
+    assert int(n) >= 2 and int(r) >= 1 and int(p) >= 1
     assert len(salt) == 32  # 16 bytes hex = 32 chars
-    assert len(hash_part) == 64  # SHA-256 = 64 chars hex
+    assert len(hash_part) == 128  # 64-byte digest = 128 chars hex
 
 
 def test_verify_password():
@@ -52,9 +49,57 @@ def test_verify_password():
     assert not verify_password(password, "malformed_hash")
 
 
+def test_verify_password_legacy_format():
+    """Test verification of legacy salted SHA-256 hashes."""
+    password = "legacy_password"
+    salt = "ab" * 16
+    legacy_hash = f"{salt}:{hashlib.sha256((password + salt).encode()).hexdigest()}"
+
+    assert verify_password(password, legacy_hash)
+    assert not verify_password("wrong_password", legacy_hash)
+
+
+def test_verify_password_pbkdf2_format():
+    """Test verification of PBKDF2 hashes from before the scrypt switch."""
+    password = "pbkdf2_password"
+    salt = bytes.fromhex("ef" * 16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, 1000)
+    pbkdf2_hash = f"pbkdf2_sha256$1000${salt.hex()}${digest.hex()}"
+
+    assert verify_password(password, pbkdf2_hash)
+    assert not verify_password("wrong_password", pbkdf2_hash)
+
+
+def test_authenticate_user_upgrades_legacy_hash(new_db):
+    """Test that a successful login re-hashes a legacy password hash."""
+    user_data = make_user("legacyuser", email="legacy@example.com", full_name="Legacy User")
+    user = create_user(user_data)
+    assert user is not None
+    assert user.id is not None
+
+    # Downgrade the stored hash to the legacy format
+    salt = "cd" * 16
+    legacy_hash = f"{salt}:{hashlib.sha256(('password123' + salt).encode()).hexdigest()}"
+    # Resolve get_session at call time so the new_db fixture's patched,
+    # transaction-bound session factory is picked up
+    with app.database.get_session() as session:
+        db_user = session.get(User, user.id)
+        assert db_user is not None
+        db_user.password_hash = legacy_hash
+        session.add(db_user)
+        session.commit()
+
+    # Login succeeds and transparently upgrades the hash out of the
+    # legacy salt:digest format
+    authenticated_user = authenticate_user(UserLogin(username="legacyuser", password="password123"))
+    assert authenticated_user is not None
+    assert authenticated_user.password_hash != legacy_hash
+    assert ":" not in authenticated_user.password_hash
+
+
 def test_create_user_success(new_db):
     """Test successful user creation."""
-    user_data = UserCreate(username="testuser", email="test@example.com", password="password123", full_name="Test User")
+    user_data = make_user("testuser", email="test@example.com", full_name="Test User")
 
     user = create_user(user_data)
     assert user is not None
@@ -65,25 +110,40 @@ def test_create_user_success(new_db):
     assert not user.is_authenticated
     assert user.id is not None
 
-    # Password should be hashed
+    # Password should be hashed (the test KDF fake from conftest still
+    # produces a scheme-prefixed hash, never the plain password)
     assert user.password_hash != "password123"
-    assert ":" in user.password_hash
+    assert "$" in user.password_hash
+
+
+def test_create_users_bulk(new_db):
+    """Test batch user creation with a single commit."""
+    users_data = [make_user(f"bulkuser{i}", email=f"bulk{i}@example.com", full_name=f"Bulk User {i}") for i in range(3)]
+
+    users = create_users_bulk(users_data)
+    assert users is not None
+    assert len(users) == 3
+    assert all(user.id is not None for user in users)
+
+    # A batch containing a duplicate is rolled back as a whole
+    duplicate_batch = [
+        make_user("bulkuser0", email="other@example.com", full_name="Dup User"),
+        make_user("bulkuser9", email="bulk9@example.com", full_name="Bulk User 9"),
+    ]
+    assert create_users_bulk(duplicate_batch) is None
+    assert get_user_by_username("bulkuser9") is None
 
 
 def test_create_user_duplicate_username(new_db):
     """Test user creation with duplicate username."""
-    user_data = UserCreate(
-        username="duplicate", email="test1@example.com", password="password123", full_name="Test User 1"
-    )
+    user_data = make_user("duplicate", email="test1@example.com", full_name="Test User 1")
 
     # Create first user
     user1 = create_user(user_data)
     assert user1 is not None
 
     # Try to create second user with same username
-    user_data2 = UserCreate(
-        username="duplicate", email="test2@example.com", password="password456", full_name="Test User 2"
-    )
+    user_data2 = make_user("duplicate", email="test2@example.com", password="password456", full_name="Test User 2")
 
     user2 = create_user(user_data2)
     assert user2 is None
@@ -91,18 +151,14 @@ def test_create_user_duplicate_username(new_db):
 
 def test_create_user_duplicate_email(new_db):
     """Test user creation with duplicate email."""
-    user_data1 = UserCreate(
-        username="user1", email="duplicate@example.com", password="password123", full_name="Test User 1"
-    )
+    user_data1 = make_user("user1", email="duplicate@example.com", full_name="Test User 1")
 
     # Create first user
     user1 = create_user(user_data1)
     assert user1 is not None
 
     # Try to create second user with same email
-    user_data2 = UserCreate(
-        username="user2", email="duplicate@example.com", password="password456", full_name="Test User 2"
-    )
+    user_data2 = make_user("user2", email="duplicate@example.com", password="password456", full_name="Test User 2")
 
     user2 = create_user(user_data2)
     assert user2 is None
@@ -111,7 +167,7 @@ def test_create_user_duplicate_email(new_db):
 def test_authenticate_user_success(new_db):
     """Test successful user authentication."""
     # Create user first
-    user_data = UserCreate(username="authuser", email="auth@example.com", password="password123", full_name="Auth User")
+    user_data = make_user("authuser", email="auth@example.com", full_name="Auth User")
     created_user = create_user(user_data)
     assert created_user is not None
 
@@ -128,9 +184,7 @@ def test_authenticate_user_success(new_db):
 def test_authenticate_user_wrong_password(new_db):
     """Test authentication with wrong password."""
     # Create user first
-    user_data = UserCreate(
-        username="authuser2", email="auth2@example.com", password="password123", full_name="Auth User 2"
-    )
+    user_data = make_user("authuser2", email="auth2@example.com", full_name="Auth User 2")
     created_user = create_user(user_data)
     assert created_user is not None
 
@@ -152,9 +206,7 @@ def test_authenticate_user_nonexistent(new_db):
 def test_create_session(new_db):
     """Test session creation."""
     # Create user first
-    user_data = UserCreate(
-        username="sessionuser", email="session@example.com", password="password123", full_name="Session User"
-    )
+    user_data = make_user("sessionuser", email="session@example.com", full_name="Session User")
     user = create_user(user_data)
     assert user is not None
     assert user.id is not None
@@ -171,9 +223,7 @@ def test_create_session(new_db):
 def test_create_session_deactivates_existing(new_db):
     """Test that creating a new session deactivates existing ones."""
     # Create user
-    user_data = UserCreate(
-        username="multiuser", email="multi@example.com", password="password123", full_name="Multi User"
-    )
+    user_data = make_user("multiuser", email="multi@example.com", full_name="Multi User")
     user = create_user(user_data)
     assert user is not None
     assert user.id is not None
@@ -197,9 +247,7 @@ def test_create_session_deactivates_existing(new_db):
 def test_validate_session_valid(new_db):
     """Test validating a valid session."""
     # Create user and session
-    user_data = UserCreate(
-        username="validuser", email="valid@example.com", password="password123", full_name="Valid User"
-    )
+    user_data = make_user("validuser", email="valid@example.com", full_name="Valid User")
     user = create_user(user_data)
     assert user is not None
     assert user.id is not None
@@ -214,6 +262,27 @@ def test_validate_session_valid(new_db):
     assert validated_user.username == user.username
 
 
+def test_validate_session_cache_invalidated_on_new_session(new_db):
+    """Test that a cached session stops validating once a new session replaces it."""
+    user_data = make_user("cacheuser", email="cache@example.com", full_name="Cache User")
+    user = create_user(user_data)
+    assert user is not None
+    assert user.id is not None
+
+    session1 = create_session(user.id)
+    assert session1 is not None
+
+    # Validate so the session ends up in the in-process cache
+    assert validate_session(session1.session_token) is not None
+
+    # Creating a new session deactivates the old one and must evict it from the cache
+    session2 = create_session(user.id)
+    assert session2 is not None
+
+    assert validate_session(session1.session_token) is None
+    assert validate_session(session2.session_token) is not None
+
+
 def test_validate_session_invalid_token(new_db):
     """Test validating an invalid session token."""
     validated_user = validate_session("invalid_token")
@@ -232,9 +301,7 @@ def test_validate_session_empty_token(new_db):
 def test_logout_user(new_db):
     """Test user logout."""
     # Create user and session
-    user_data = UserCreate(
-        username="logoutuser", email="logout@example.com", password="password123", full_name="Logout User"
-    )
+    user_data = make_user("logoutuser", email="logout@example.com", full_name="Logout User")
     user = create_user(user_data)
     assert user is not None
     assert user.id is not None
@@ -260,10 +327,31 @@ def test_logout_invalid_token(new_db):
     assert not result
 
 
+def test_sweep_expired_sessions(new_db):
+    """Test that the sweeper removes deactivated sessions but keeps active ones."""
+    user_data = make_user("sweepuser", email="sweep@example.com", full_name="Sweep User")
+    user = create_user(user_data)
+    assert user is not None
+    assert user.id is not None
+
+    session1 = create_session(user.id)
+    assert session1 is not None
+
+    # Creating a second session deactivates the first, leaving it sweepable
+    session2 = create_session(user.id)
+    assert session2 is not None
+
+    removed = sweep_expired_sessions()
+    assert removed == 1
+
+    # The active session survives the sweep
+    assert validate_session(session2.session_token) is not None
+
+
 def test_get_user_by_username(new_db):
     """Test getting user by username."""
     # Create user
-    user_data = UserCreate(username="getuser", email="get@example.com", password="password123", full_name="Get User")
+    user_data = make_user("getuser", email="get@example.com", full_name="Get User")
     created_user = create_user(user_data)
     assert created_user is not None
 
@@ -128,7 +128,7 @@ def test_get_user_statistics():
     assert stats["account_age_days"] == 15
     assert stats["account_status"] == "Active"
     assert stats["total_logins"] == "N/A"
-    assert last_login.strftime("%Y-%m-%d %H:%M:%S") in stats["last_activity"]
+    assert last_login.isoformat(sep=" ", timespec="seconds") in stats["last_activity"]
 
 
 def test_get_user_statistics_inactive():
@@ -42,35 +42,12 @@ def test_welcome_message_edge_hours():
     )
 
     # Test 5 AM (morning start)
-    test_time = datetime(2024, 1, 1, 5, 0, 0)
-
-    # Mock datetime.utcnow in the function
-    import app.dashboard_service
-
-    original_datetime = app.dashboard_service.datetime
-
-    class MockDateTime:
-        @staticmethod
-        def utcnow():
-            return test_time
-
-    app.dashboard_service.datetime = MockDateTime
-
-    try:
-        message = generate_welcome_message(user)
-        assert "Good morning" in message
-    finally:
-        app.dashboard_service.datetime = original_datetime
+    message = generate_welcome_message(user, now=datetime(2024, 1, 1, 5, 0, 0))
+    assert "Good morning" in message
 
     # Test 12 PM (afternoon start)
-    test_time = datetime(2024, 1, 1, 12, 0, 0)
-    app.dashboard_service.datetime = MockDateTime
-
-    try:
-        message = generate_welcome_message(user)
-        assert "Good afternoon" in message
-    finally:
-        app.dashboard_service.datetime = original_datetime
+    message = generate_welcome_message(user, now=datetime(2024, 1, 1, 12, 0, 0))
+    assert "Good afternoon" in message
 
 
 def test_user_statistics_comprehensive():
@@ -98,7 +75,7 @@ def test_user_statistics_comprehensive():
     assert stats["total_logins"] == "N/A"
 
     # Check last activity format
-    expected_time = last_login.strftime("%Y-%m-%d %H:%M:%S")
+    expected_time = last_login.isoformat(sep=" ", timespec="seconds")
     assert expected_time in stats["last_activity"]
 
 
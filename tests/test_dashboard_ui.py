@@ -1,19 +1,9 @@
 """UI tests for dashboard functionality."""
 
-import pytest
 from nicegui.testing import User as TestUser
 from nicegui import ui
 
 
-@pytest.fixture()
-def new_db():
-    from app.database import reset_db
-
-    reset_db()
-    yield
-    reset_db()
-
-
 async def test_dashboard_requires_auth_redirect(user: TestUser) -> None:
     """Test that dashboard requires authentication and redirects to login."""
     await user.open("/dashboard")
@@ -1,19 +1,9 @@
 """Integration tests for the complete authentication flow."""
 
-import pytest
 from nicegui.testing import User as TestUser
 from nicegui import ui
 
 
-@pytest.fixture()
-def new_db():
-    from app.database import reset_db
-
-    reset_db()
-    yield
-    reset_db()
-
-
 async def test_index_page_redirect_logic(user: TestUser, new_db) -> None:
     """Test index page redirects correctly based on auth status."""
     # Access index page without authentication
@@ -1,20 +1,10 @@
 """UI tests for login functionality."""
 
-import pytest
 from nicegui.testing import User as TestUser
 from nicegui import ui
 
-from app.models import UserCreate
 from app.auth_service import create_user
-
-
-@pytest.fixture()
-def new_db():
-    from app.database import reset_db
-
-    reset_db()
-    yield
-    reset_db()
+from conftest import make_user
 
 
 async def test_login_page_loads(user: TestUser) -> None:
@@ -54,7 +44,7 @@ async def test_create_demo_account(user: TestUser, new_db) -> None:
 async def test_create_demo_account_duplicate(user: TestUser, new_db) -> None:
     """Test creating demo account when it already exists."""
     # Create demo user first
-    demo_user = UserCreate(username="demo", email="demo@example.com", password="demo123", full_name="Demo User")
+    demo_user = make_user("demo", password="demo123", full_name="Demo User")
     create_user(demo_user)
 
     await user.open("/login")